@@ -1,22 +1,81 @@
-from flask import Flask, jsonify, request, redirect, url_for
+import logging
+import os
+import orjson
+from typing import Optional
+from flask import Flask, Response, request, redirect, url_for
 from .models import url_store
-from .utils import is_valid_url, generate_unique_short_code, normalize_url
+from .utils import generate_unique_short_code, normalize_and_validate
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# Skip the trailing-slash redirect branch when matching routes
+app.url_map.strict_slashes = False
+# Don't sort keys in any response still serialized by Flask's JSON provider
+app.json.sort_keys = False
+
+def _public_base_url() -> Optional[str]:
+    """Read PUBLIC_BASE_URL from the environment, ensuring a trailing slash."""
+    base_url = os.environ.get('PUBLIC_BASE_URL')
+    if base_url and not base_url.endswith('/'):
+        base_url += '/'
+    return base_url or None
+
+# Public base for short URLs (e.g. "https://sho.rt/"), read once at import.
+# When unset, the base comes from request.host_url on every request.
+app.config['PUBLIC_BASE_URL'] = _public_base_url()
+
+def ojson(data, status: int = 200) -> Response:
+    """Build a JSON response serialized with orjson (or from pre-serialized bytes)."""
+    body = data if isinstance(data, bytes) else orjson.dumps(data)
+    return Response(body, status=status, mimetype='application/json')
+
+# Fixed response bodies are serialized once at import
+_HEALTHY_BODY = orjson.dumps({
+    "status": "healthy",
+    "service": "URL Shortener API"
+})
+_API_HEALTH_BODY = orjson.dumps({
+    "status": "ok",
+    "message": "URL Shortener API is running"
+})
+_NO_JSON_BODY = orjson.dumps({
+    'error': 'No JSON data in request body',
+    'message': 'Please provide a JSON request with Content-Type: application/json'
+})
+_MISSING_URL_BODY = orjson.dumps({
+    'error': 'Missing URL in request body',
+    'message': 'Please provide a URL in JSON format: {"url": "https://example.com"}'
+})
+_EMPTY_URL_BODY = orjson.dumps({
+    'error': 'Empty URL provided',
+    'message': 'URL cannot be empty'
+})
+_INVALID_URL_BODY = orjson.dumps({
+    'error': 'Invalid URL format',
+    'message': 'Please provide a valid URL (e.g., https://example.com)'
+})
+_CODE_EXHAUSTED_BODY = orjson.dumps({
+    'error': 'Failed to generate unique short code',
+    'message': 'Please try again'
+})
+_NOT_FOUND_BODY = orjson.dumps({
+    'error': 'Not found',
+    'message': 'The requested resource was not found'
+})
+_INTERNAL_ERROR_BODY = orjson.dumps({
+    'error': 'Internal server error',
+    'message': 'An unexpected error occurred'
+})
 
 @app.route('/')
 def health_check():
-    return jsonify({
-        "status": "healthy",
-        "service": "URL Shortener API"
-    })
+    return ojson(_HEALTHY_BODY)
 
 @app.route('/api/health')
 def api_health():
-    return jsonify({
-        "status": "ok",
-        "message": "URL Shortener API is running"
-    })
+    return ojson(_API_HEALTH_BODY)
 
 @app.route('/api/shorten', methods=['POST'])
 def shorten_url():
@@ -26,71 +85,55 @@ def shorten_url():
     Expects JSON: {"url": "https://example.com"}
     Returns: {"short_code": "abc123", "short_url": "http://localhost:5000/abc123"}
     """
+    # Get JSON data (parsed regardless of content-type, like get_json(force=True))
     try:
-        print("Starting URL shortening process...")
-        
-        # Get JSON data
-        data = request.get_json(force=True)  # force=True parses JSON even if content-type is not application/json
-        
-        if not data:
-            print("ERROR: No JSON data found!")
-            return jsonify({
-                'error': 'No JSON data in request body',
-                'message': 'Please provide a JSON request with Content-Type: application/json'
-            }), 400
-            
-        if 'url' not in data:
-            print("ERROR: 'url' key not found in JSON data!")
-            return jsonify({
-                'error': 'Missing URL in request body',
-                'message': 'Please provide a URL in JSON format: {"url": "https://example.com"}'
-            }), 400
-        
-        original_url = data['url'].strip()
-        print(f"Original URL: {original_url}")
-        
-        # Validate URL
-        if not original_url:
-            return jsonify({
-                'error': 'Empty URL provided',
-                'message': 'URL cannot be empty'
-            }), 400
-            
-        # Normalize URL (add https:// if missing scheme)
-        normalized_url = normalize_url(original_url)
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        data = None
+    
+    if not data:
+        logger.debug("No JSON data in shorten request")
+        return ojson(_NO_JSON_BODY, 400)
         
-        if not is_valid_url(normalized_url):
-            return jsonify({
-                'error': 'Invalid URL format',
-                'message': 'Please provide a valid URL (e.g., https://example.com)'
-            }), 400
-            
-        # Generate unique short code
-        short_code = generate_unique_short_code(url_store.exists)
-        if not short_code:
-            return jsonify({
-                'error': 'Failed to generate unique short code',
-                'message': 'Please try again'
-            }), 500
-            
-        print(f"Generated short code: {short_code}")
-        # Store the mapping
-        mapping = url_store.add_mapping(normalized_url, short_code)
+    if not isinstance(data, dict) or 'url' not in data:
+        logger.debug("'url' key missing from shorten request")
+        return ojson(_MISSING_URL_BODY, 400)
+    
+    original_url = data['url']
+    if not isinstance(original_url, str):
+        return ojson(_INVALID_URL_BODY, 400)
+    
+    original_url = original_url.strip()
+    logger.debug("Original URL: %s", original_url)
+    
+    # Validate URL
+    if not original_url:
+        return ojson(_EMPTY_URL_BODY, 400)
         
-        # Build short URL
-        short_url = request.host_url + short_code
+    # Normalize (add https:// if missing scheme) and validate in one pass
+    normalized_url = normalize_and_validate(original_url)
+    
+    if not normalized_url:
+        return ojson(_INVALID_URL_BODY, 400)
         
-        return jsonify({
-            'short_code': short_code,
-            'short_url': short_url,
-            'original_url': normalized_url
-        }), 201
+    # Generate unique short code
+    short_code = generate_unique_short_code(url_store.exists)
+    if not short_code:
+        return ojson(_CODE_EXHAUSTED_BODY, 500)
         
-    except Exception as e:
-        return jsonify({
-            'error': 'Internal server error',
-            'message': 'An unexpected error occurred'
-        }), 500
+    logger.debug("Generated short code: %s", short_code)
+    # Store the mapping
+    url_store.add(short_code, normalized_url)
+    
+    # Build short URL
+    base_url = app.config['PUBLIC_BASE_URL'] or request.host_url
+    short_url = f"{base_url}{short_code}"
+    
+    return ojson({
+        'short_code': short_code,
+        'short_url': short_url,
+        'original_url': normalized_url
+    }, 201)
 
 @app.route('/<short_code>')
 def redirect_to_url(short_code):
@@ -103,19 +146,19 @@ def redirect_to_url(short_code):
     Returns:
         Redirect to original URL or 404 if not found
     """
-    mapping = url_store.get_mapping(short_code)
+    original_url = url_store.get_url(short_code)
     
-    if not mapping:
-        return jsonify({
+    if original_url is None:
+        return ojson({
             'error': 'Short code not found',
             'message': f'The short code "{short_code}" does not exist'
-        }), 404
+        }, 404)
     
     # Increment click count
-    mapping.increment_clicks()
+    url_store.incr(short_code)
     
     # Redirect to original URL
-    return redirect(mapping.original_url)
+    return redirect(original_url)
 
 @app.route('/api/stats/<short_code>')
 def get_url_stats(short_code):
@@ -128,29 +171,25 @@ def get_url_stats(short_code):
     Returns:
         JSON with URL, clicks, and creation timestamp
     """
-    mapping = url_store.get_mapping(short_code)
+    stats = url_store.stats(short_code)
     
-    if not mapping:
-        return jsonify({
+    if stats is None:
+        return ojson({
             'error': 'Short code not found',
             'message': f'The short code "{short_code}" does not exist'
-        }), 404
+        }, 404)
     
-    return jsonify(mapping.to_dict()), 200
+    return ojson(stats)
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({
-        'error': 'Not found',
-        'message': 'The requested resource was not found'
-    }), 404
+    return ojson(_NOT_FOUND_BODY, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({
-        'error': 'Internal server error',
-        'message': 'An unexpected error occurred'
-    }), 500
+    return ojson(_INTERNAL_ERROR_BODY, 500)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only; see wsgi.py for running under gunicorn
+    debug = os.environ.get('FLASK_DEBUG', '').lower() not in ('', '0', 'false', 'no')
+    app.run(host='0.0.0.0', port=5000, debug=debug)
\ No newline at end of file
@@ -1,59 +1,106 @@
-from datetime import datetime, timezone
+import contextlib
 import threading
+import time
 from typing import Dict, Optional
 
-class URLMapping:
-    """Represents a URL mapping with metadata."""
-    
-    def __init__(self, original_url: str, short_code: str):
-        self.original_url = original_url
-        self.short_code = short_code
-        self.clicks = 0
-        self.created_at = datetime.now(timezone.utc)
-        self._lock = threading.Lock()
+# ISO 8601 UTC timestamp with second precision
+_TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+class _Shard:
+    """One partition of the URL store, with its own write lock."""
     
-    def increment_clicks(self):
-        """Thread-safe increment of click count."""
-        with self._lock:
-            self.clicks += 1
+    __slots__ = ('urls', 'clicks', 'created', 'lock')
     
-    def to_dict(self):
-        """Convert to dictionary for JSON serialization."""
-        return {
-            'url': self.original_url,
-            'short_code': self.short_code,
-            'clicks': self.clicks,
-            'created_at': self.created_at.isoformat()
-        }
+    def __init__(self):
+        self.urls: Dict[str, str] = {}
+        self.clicks: Dict[str, int] = {}
+        self.created: Dict[str, float] = {}
+        self.lock = threading.Lock()
 
 class URLStore:
-    """Thread-safe in-memory store for URL mappings."""
+    """
+    Thread-safe in-memory store for URL mappings.
+    
+    Mappings are kept as parallel dicts keyed by short code (original URL,
+    click count and creation time) rather than one object per mapping.
+    They are split across ``SHARD_COUNT`` shards by hash of the short code,
+    each with its own lock, so writers of different codes rarely contend.
+    
+    Reads are lock-free: single dict lookups on str keys are atomic under
+    the GIL. Writers, including click increments, take their shard's lock.
+    The dicts must never be mutated in place outside the lock; if they ever
+    need rebuilding, build the new dicts and reassign them while holding
+    the lock.
+    """
+    
+    SHARD_COUNT = 16  # Must be a power of two
     
     def __init__(self):
-        self._mappings: Dict[str, URLMapping] = {}
-        self._lock = threading.RLock()
+        self._shards = [_Shard() for _ in range(self.SHARD_COUNT)]
+        self._shard_mask = self.SHARD_COUNT - 1
     
-    def add_mapping(self, original_url: str, short_code: str) -> URLMapping:
+    def _shard(self, short_code: str) -> _Shard:
+        return self._shards[hash(short_code) & self._shard_mask]
+    
+    def add(self, short_code: str, original_url: str) -> None:
         """Add a new URL mapping."""
-        with self._lock:
-            mapping = URLMapping(original_url, short_code)
-            self._mappings[short_code] = mapping
-            return mapping
+        shard = self._shard(short_code)
+        with shard.lock:
+            shard.created[short_code] = time.time()
+            shard.clicks[short_code] = 0
+            # Published last so lock-free readers never see a partial entry
+            shard.urls[short_code] = original_url
     
-    def get_mapping(self, short_code: str) -> Optional[URLMapping]:
-        """Get URL mapping by short code."""
-        with self._lock:
-            return self._mappings.get(short_code)
+    def get_url(self, short_code: str) -> Optional[str]:
+        """Get the original URL for a short code."""
+        return self._shard(short_code).urls.get(short_code)
     
     def exists(self, short_code: str) -> bool:
         """Check if short code exists."""
-        with self._lock:
-            return short_code in self._mappings
+        return short_code in self._shard(short_code).urls
+    
+    def incr(self, short_code: str) -> None:
+        """Thread-safe increment of click count."""
+        shard = self._shard(short_code)
+        with shard.lock:
+            shard.clicks[short_code] += 1
+    
+    def clicks(self, short_code: str) -> int:
+        """Current click count for a short code."""
+        return self._shard(short_code).clicks[short_code]
+    
+    def stats(self, short_code: str) -> Optional[dict]:
+        """Get analytics for a short code as a JSON-serializable dict."""
+        shard = self._shard(short_code)
+        original_url = shard.urls.get(short_code)
+        if original_url is None:
+            return None
+        
+        created_at = time.strftime(_TIMESTAMP_FORMAT, time.gmtime(shard.created[short_code]))
+        return {
+            'url': original_url,
+            'short_code': short_code,
+            'clicks': self.clicks(short_code),
+            'created_at': created_at
+        }
+    
+    def get_all_urls(self) -> Dict[str, str]:
+        """Get all short code to URL mappings (for testing purposes)."""
+        with contextlib.ExitStack() as stack:
+            for shard in self._shards:
+                stack.enter_context(shard.lock)
+            urls: Dict[str, str] = {}
+            for shard in self._shards:
+                urls.update(shard.urls)
+            return urls
     
-    def get_all_mappings(self) -> Dict[str, URLMapping]:
-        """Get all mappings (for testing purposes)."""
-        with self._lock:
-            return self._mappings.copy()
+    def clear(self) -> None:
+        """Remove all mappings (for testing purposes)."""
+        for shard in self._shards:
+            with shard.lock:
+                shard.urls = {}
+                shard.clicks = {}
+                shard.created = {}
 
 # Global store instance
 url_store = URLStore()
\ No newline at end of file
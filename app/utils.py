@@ -1,9 +1,61 @@
-import re
+import functools
+import ipaddress
 import string
 import random
 from urllib.parse import urlparse
 from typing import Optional
 
+_ALLOWED_SCHEMES = frozenset(('http', 'https'))
+_SCHEMES = ('http://', 'https://')
+_MAX_URL_LENGTH = 2048
+_HOST_CHARS = frozenset(string.ascii_letters + string.digits + '-.')
+_MAX_LABEL_LENGTH = 63
+# Tuple of one-char strings: random.choices indexes it directly
+_ALPHABET = tuple(string.ascii_letters + string.digits)
+# Validation results are memoized per process; popular URLs are often
+# shortened repeatedly in bursts.
+_VALIDATION_CACHE_SIZE = 4096
+
+def _is_valid_host(host: str) -> bool:
+    """
+    Validate the host part of a URL without backtracking.
+    
+    Accepts ``localhost``, IPv4 addresses and dotted domain names whose
+    labels are alphanumeric (hyphens allowed inside) and whose top-level
+    label is 2-6 letters.
+    """
+    # One C-level set check covers the charset of every label at once
+    if not host or not _HOST_CHARS.issuperset(host):
+        return False
+    
+    if host.lower() == 'localhost':
+        return True
+    
+    # The top-level label must be alphabetic, so only hosts ending in a
+    # digit need the (exception-raising) IPv4 parse.
+    if host[-1].isdigit():
+        try:
+            ipaddress.IPv4Address(host)
+            return True
+        except ValueError:
+            return False
+    
+    labels = host.split('.')
+    if labels[-1] == '':
+        # Allow a single trailing dot (fully qualified domain name)
+        labels.pop()
+    if len(labels) < 2:
+        return False
+    
+    for label in labels:
+        if not label or len(label) > _MAX_LABEL_LENGTH:
+            return False
+        if label[0] == '-' or label[-1] == '-':
+            return False
+    
+    tld = labels[-1]
+    return 2 <= len(tld) <= 6 and tld.isalpha()
+
 def is_valid_url(url: str) -> bool:
     """
     Validate if a URL is properly formatted.
@@ -17,24 +69,37 @@ def is_valid_url(url: str) -> bool:
     if not url or not isinstance(url, str):
         return False
     
-    # Basic URL pattern validation
-    url_pattern = re.compile(
-        r'^https?://'  # http:// or https://
-        r'(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?|'  # domain...
-        r'localhost|'  # localhost...
-        r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})'  # ...or ip
-        r'(?::\d+)?'  # optional port
-        r'(?:/?|[/?]\S+)$', re.IGNORECASE)
+    # Bound the work done on untrusted input; this also keeps oversized
+    # strings out of the validation cache.
+    if len(url) > _MAX_URL_LENGTH:
+        return False
     
-    if not url_pattern.match(url):
+    return _check_url(url)
+
+@functools.lru_cache(maxsize=_VALIDATION_CACHE_SIZE)
+def _check_url(url: str) -> bool:
+    """Validate a URL string already known to be within the length limit."""
+    # URLs may not contain whitespace anywhere
+    if len(url.split(maxsplit=1)) != 1:
         return False
     
-    # Additional validation using urlparse
     try:
         parsed = urlparse(url)
-        return all([parsed.scheme, parsed.netloc])
-    except Exception:
+    except ValueError:
+        return False
+    
+    if parsed.scheme.lower() not in _ALLOWED_SCHEMES:
+        return False
+    
+    netloc = parsed.netloc
+    if not netloc or '@' in netloc:
+        return False
+    
+    host, sep, port = netloc.partition(':')
+    if sep and not (port.isascii() and port.isdigit()):
         return False
+    
+    return _is_valid_host(host)
 
 def generate_short_code(length: int = 6) -> str:
     """
@@ -46,24 +111,42 @@ def generate_short_code(length: int = 6) -> str:
     Returns:
         Random alphanumeric string
     """
-    characters = string.ascii_letters + string.digits
-    return ''.join(random.choice(characters) for _ in range(length))
+    return ''.join(random.choices(_ALPHABET, k=length))
 
-def generate_unique_short_code(existing_codes_checker, max_attempts: int = 100) -> Optional[str]:
+def generate_unique_short_code(existing_codes_checker, max_attempts: int = 100,
+                               length: int = 6, batch_size: int = 4) -> Optional[str]:
     """
     Generate a unique short code that doesn't exist in the store.
     
+    The first candidate is drawn on its own, since it almost always wins.
+    Only after a collision are the remaining candidates drawn in batches
+    from a single random.choices call.
+    
     Args:
         existing_codes_checker: Function that checks if a code exists
-        max_attempts: Maximum number of attempts to generate unique code
+        max_attempts: Maximum number of candidate codes to try
+        length: Length of the short code (default: 6)
+        batch_size: Number of candidates generated per batch after a collision
         
     Returns:
         Unique short code or None if failed to generate
     """
-    for _ in range(max_attempts):
-        code = generate_short_code()
-        if not existing_codes_checker(code):
-            return code
+    if max_attempts < 1:
+        return None
+    
+    code = generate_short_code(length)
+    if not existing_codes_checker(code):
+        return code
+    
+    remaining = max_attempts - 1
+    while remaining > 0:
+        count = min(batch_size, remaining)
+        remaining -= count
+        chars = ''.join(random.choices(_ALPHABET, k=length * count))
+        for start in range(0, length * count, length):
+            code = chars[start:start + length]
+            if not existing_codes_checker(code):
+                return code
     return None
 
 def normalize_url(url: str) -> str:
@@ -76,6 +159,27 @@ def normalize_url(url: str) -> str:
     Returns:
         Normalized URL with proper scheme
     """
-    if not url.startswith(('http://', 'https://')):
+    if not url.startswith(_SCHEMES):
         url = 'https://' + url
-    return url
\ No newline at end of file
+    return url
+
+def normalize_and_validate(url: str) -> Optional[str]:
+    """
+    Normalize and validate a URL, parsing it only once.
+    
+    Adds ``https://`` when no scheme is given, then validates the result
+    with a single ``urlparse`` call. Unlike ``is_valid_url`` it does not
+    check the argument's type or strip it; callers pass a stripped string.
+    
+    Args:
+        url: The stripped URL to normalize and validate
+        
+    Returns:
+        Normalized URL if valid, None otherwise
+    """
+    # Checked before normalizing so oversized input is never cached
+    if not url or len(url) > _MAX_URL_LENGTH:
+        return None
+    
+    normalized = normalize_url(url)
+    return normalized if _check_url(normalized) else None
@@ -2,15 +2,18 @@ import pytest
 import json
 import threading
 import time
-from app.main import app
-from app.models import url_store
+from urllib.parse import urlparse
+from app.main import _public_base_url, app
+from app.models import URLStore, url_store
+from app import utils as app_utils
+from app.utils import generate_unique_short_code, is_valid_url, normalize_and_validate
 
 @pytest.fixture
 def client():
     app.config['TESTING'] = True
     with app.test_client() as client:
         # Clear the store before each test
-        url_store._mappings.clear()
+        url_store.clear()
         yield client
 
 def test_health_check(client):
@@ -197,4 +200,127 @@ def test_unique_short_codes(client):
         assert response.status_code == 201
         short_code = response.get_json()['short_code']
         assert short_code not in short_codes
-        short_codes.add(short_code)
\ No newline at end of file
+        short_codes.add(short_code)
+
+def test_shorten_malformed_urls(client):
+    """Test that malformed hosts, schemes and ports are rejected."""
+    for bad_url in ['ftp://example.com', 'https://exa mple.com',
+                    'https://-example.com', 'https://example.com:80a',
+                    'https://' + 'a' * 64 + '.com',
+                    'https://example.com/' + 'a' * 2048]:
+        response = client.post('/api/shorten',
+                              data=json.dumps({'url': bad_url}),
+                              content_type='application/json')
+        assert response.status_code == 400, bad_url
+
+def test_overlapping_click_increments():
+    """Test that an increment paused mid-update doesn't lose a concurrent one."""
+    store = URLStore()
+    store.add('abc123', 'https://www.example.com')
+    shard = store._shard('abc123')
+    
+    paused = threading.Event()
+    resume = threading.Event()
+    
+    class PausingDict(dict):
+        """Pauses the first read of a click count before it is written back."""
+        def __getitem__(self, key):
+            value = super().__getitem__(key)
+            if not paused.is_set():
+                paused.set()
+                resume.wait(5)
+            return value
+    
+    shard.clicks = PausingDict(shard.clicks)
+    first = threading.Thread(target=store.incr, args=('abc123',))
+    second = threading.Thread(target=store.incr, args=('abc123',))
+    
+    first.start()
+    assert paused.wait(5)
+    second.start()
+    second.join(0.1)
+    # The second increment must wait for the first one to finish
+    assert second.is_alive()
+    resume.set()
+    first.join(5)
+    second.join(5)
+    
+    assert store.clicks('abc123') == 2
+
+def test_url_validation_cache(monkeypatch):
+    """Test that validation is memoized and oversized or unhashable input is rejected up front."""
+    parse_calls = []
+    
+    def counting_urlparse(url):
+        parse_calls.append(url)
+        return urlparse(url)
+    
+    monkeypatch.setattr(app_utils, 'urlparse', counting_urlparse)
+    
+    url = 'https://cache-test.example.com/path'
+    assert is_valid_url(url)
+    assert is_valid_url(url)
+    assert parse_calls == [url]
+    
+    assert not is_valid_url('https://example.com/' + 'a' * 10000)
+    assert normalize_and_validate('example.com/' + 'a' * 10000) is None
+    assert parse_calls == [url]
+    
+    assert not is_valid_url([])
+
+@pytest.mark.parametrize('base_url', ['https://sho.rt/', 'https://sho.rt'])
+def test_shorten_uses_public_base_url(client, monkeypatch, base_url):
+    """Test that PUBLIC_BASE_URL, with or without a trailing slash, overrides the request host."""
+    monkeypatch.setenv('PUBLIC_BASE_URL', base_url)
+    monkeypatch.setitem(app.config, 'PUBLIC_BASE_URL', _public_base_url())
+    
+    response = client.post('/api/shorten',
+                          data=json.dumps({'url': 'https://www.example.com'}),
+                          content_type='application/json')
+    
+    data = response.get_json()
+    assert data['short_url'] == 'https://sho.rt/' + data['short_code']
+
+def test_shorten_malformed_json(client):
+    """Test that a body that is not valid JSON is rejected."""
+    response = client.post('/api/shorten',
+                          data='{"url": ',
+                          content_type='application/json')
+    
+    assert response.status_code == 400
+    data = response.get_json()
+    assert 'error' in data
+
+def test_shorten_non_string_url(client):
+    """Test that non-string URL values and non-object bodies are rejected."""
+    for body in [{'url': 123}, {'url': None}, ['url'], 'https://www.example.com']:
+        response = client.post('/api/shorten',
+                              data=json.dumps(body),
+                              content_type='application/json')
+        assert response.status_code == 400, body
+
+def test_generate_unique_short_code_exhaustion():
+    """Test that generation gives up after max_attempts candidates."""
+    candidates = []
+    
+    def always_taken(code):
+        candidates.append(code)
+        return True
+    
+    # 10 attempts with batches of 4 spans a partial final batch
+    assert generate_unique_short_code(always_taken, max_attempts=10, batch_size=4) is None
+    assert len(candidates) == 10
+    assert all(len(code) == 6 and code.isalnum() for code in candidates)
+
+def test_generate_unique_short_code_skips_taken_codes():
+    """Test that taken candidates are skipped, including across batches."""
+    candidates = []
+    
+    def first_five_taken(code):
+        candidates.append(code)
+        return len(candidates) <= 5
+    
+    code = generate_unique_short_code(first_five_taken, length=8, batch_size=2)
+    assert code == candidates[5]
+    assert len(candidates) == 6
+    assert all(len(candidate) == 8 for candidate in candidates)
@@ -0,0 +1,4 @@
+"""WSGI entry point, e.g. ``gunicorn -k gthread --threads 8 wsgi:app``."""
+from app.main import app
+
+__all__ = ['app']